@@ -0,0 +1,308 @@
+"""
+Content-addressed chunk store for Meridian backups.
+
+Files are split with a gear rolling hash (content-defined chunking), so an edit
+or an append only changes the chunks around it. Chunks are stored once, zlib
+compressed, at `chunks/<aa>/<sha256>`; a snapshot is a JSON manifest in
+`snapshots/<timestamp>.json` mapping each file to its chunk list. The manifest
+is written last and atomically, so a crash mid-backup leaves only unreferenced
+chunks for `gc()` to sweep.
+
+Layout under .meridian/backups/ (flat backups already there are left alone):
+
+    chunks/ab/ab12...      zlib(chunk bytes), name = sha256 of the raw bytes
+    snapshots/<ts>.json    manifest
+    .store.lock            fcntl lock shared by snapshot writers and gc
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import random
+import tempfile
+import zlib
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from pathlib import Path, PurePosixPath
+from typing import Iterator
+
+MANIFEST_VERSION = 1
+MIN_CHUNK = 16 * 1024
+AVG_CHUNK = 64 * 1024
+MAX_CHUNK = 256 * 1024
+GEAR_SEED = 0x4D6572696469616E  # "Meridian"; changing it changes every boundary
+SNAPSHOT_FORMAT = "%Y%m%dT%H%M%S%fZ"
+RETENTION_DEFAULTS = {"keep_last": 10, "keep_daily": 7, "keep_weekly": 4}
+
+_M64 = (1 << 64) - 1
+_rng = random.Random(GEAR_SEED)
+_GEAR = tuple(_rng.getrandbits(64) for _ in range(256))
+del _rng
+
+
+class StoreError(Exception):
+    """Missing or corrupt chunk or snapshot."""
+
+
+def _mask(avg_size: int) -> int:
+    # Gear hash low bits only see the last few bytes; test the high bits instead.
+    bits = max(1, avg_size.bit_length() - 1)
+    return ((1 << bits) - 1) << (64 - bits)
+
+
+def chunk_spans(
+    data: bytes,
+    start: int = 0,
+    min_size: int = MIN_CHUNK,
+    avg_size: int = AVG_CHUNK,
+    max_size: int = MAX_CHUNK,
+) -> Iterator[tuple[int, int]]:
+    """
+    Yield (begin, end) chunk boundaries of data[start:].
+
+    The hash restarts at every boundary, so chunking from any earlier boundary
+    gives the same result as chunking the whole buffer.
+    """
+    mask = _mask(avg_size)
+    gear = _GEAR
+    n = len(data)
+    pos = start
+    while pos < n:
+        end = min(pos + max_size, n)
+        cut = end
+        i = pos + min_size
+        if i < end:
+            h = 0
+            for j, byte in enumerate(data[i:end], i):
+                h = ((h << 1) + gear[byte]) & _M64
+                if not h & mask:
+                    cut = j + 1
+                    break
+        yield pos, cut
+        pos = cut
+
+
+def retention_from_config(config: dict | None) -> dict:
+    """keep_last/keep_daily/keep_weekly from the `backups:` section of config.yaml."""
+    section = (config or {}).get("backups") or {}
+    return {k: int(section.get(k, v)) for k, v in RETENTION_DEFAULTS.items()}
+
+
+def select_retained(names: list[str], keep_last: int, keep_daily: int, keep_weekly: int) -> set[str]:
+    """Snapshot names to keep: the newest N, plus the newest per day and per ISO week."""
+    newest_first = sorted(names, reverse=True)
+    keep = set(newest_first[: max(1, keep_last)])
+    days: set = set()
+    weeks: set = set()
+    for name in newest_first:
+        taken = datetime.strptime(name, SNAPSHOT_FORMAT)
+        day = taken.date()
+        week = taken.isocalendar()[:2]
+        if day not in days and len(days) < keep_daily:
+            days.add(day)
+            keep.add(name)
+        if week not in weeks and len(weeks) < keep_weekly:
+            weeks.add(week)
+            keep.add(name)
+    return keep
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp.")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class ChunkStore:
+    def __init__(self, root: Path | str) -> None:
+        self.root = Path(root)
+        self.chunks_dir = self.root / "chunks"
+        self.snapshots_dir = self.root / "snapshots"
+        self.lock_path = self.root / ".store.lock"
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+    # --- chunks ----------------------------------------------------------
+
+    def chunk_path(self, chunk_id: str) -> Path:
+        return self.chunks_dir / chunk_id[:2] / chunk_id
+
+    def put_chunk(self, data: bytes, chunk_id: str | None = None) -> tuple[str, int]:
+        """Store `data` if absent. Returns (chunk id, compressed bytes newly written)."""
+        chunk_id = chunk_id or hashlib.sha256(data).hexdigest()
+        path = self.chunk_path(chunk_id)
+        if path.exists():
+            return chunk_id, 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        packed = zlib.compress(data, 6)
+        _atomic_write(path, packed)
+        return chunk_id, len(packed)
+
+    def get_chunk(self, chunk_id: str) -> bytes:
+        try:
+            data = zlib.decompress(self.chunk_path(chunk_id).read_bytes())
+        except FileNotFoundError:
+            raise StoreError(f"missing chunk {chunk_id}") from None
+        except zlib.error as exc:
+            raise StoreError(f"corrupt chunk {chunk_id}: {exc}") from None
+        if hashlib.sha256(data).hexdigest() != chunk_id:
+            raise StoreError(f"corrupt chunk {chunk_id}: sha256 mismatch")
+        return data
+
+    # --- snapshots -------------------------------------------------------
+
+    def snapshots(self) -> list[str]:
+        if not self.snapshots_dir.is_dir():
+            return []
+        return sorted(p.stem for p in self.snapshots_dir.glob("*.json"))
+
+    def read_snapshot(self, name: str) -> dict:
+        try:
+            with (self.snapshots_dir / f"{name}.json").open(encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            raise StoreError(f"no snapshot {name!r}") from None
+        except json.JSONDecodeError as exc:
+            raise StoreError(f"unreadable snapshot {name!r}: {exc}") from None
+
+    def _store_file(self, data: bytes, previous: dict | None) -> tuple[list[list], int]:
+        """Chunk list for `data`, reusing `previous` when it is a prefix of `data`."""
+        chunks: list[list] = []
+        new_bytes = 0
+        start = 0
+        prev_chunks = (previous or {}).get("chunks") or []
+        if prev_chunks and previous["size"] <= len(data):
+            if hashlib.sha256(data[: previous["size"]]).hexdigest() == previous["sha256"]:
+                # Unchanged or appended-to: everything before the last boundary is identical.
+                keep = prev_chunks if previous["size"] == len(data) else prev_chunks[:-1]
+                for chunk_id, size in keep:
+                    if not self.chunk_path(chunk_id).exists():
+                        _, written = self.put_chunk(data[start : start + size], chunk_id)
+                        new_bytes += written
+                    chunks.append([chunk_id, size])
+                    start += size
+        for begin, end in chunk_spans(data, start):
+            chunk_id, written = self.put_chunk(data[begin:end])
+            new_bytes += written
+            chunks.append([chunk_id, end - begin])
+        return chunks, new_bytes
+
+    def write_snapshot(self, base_dir: Path | str, paths: list[Path | str], now: datetime | None = None) -> dict:
+        """Back up `paths` (files under `base_dir`) as a new snapshot and return its manifest."""
+        base_dir = Path(base_dir)
+        now = now or datetime.now(timezone.utc)
+        with self.lock():
+            names = self.snapshots()
+            previous = {}
+            if names:
+                previous = {f["path"]: f for f in self.read_snapshot(names[-1]).get("files", [])}
+            files = []
+            logical = new_bytes = 0
+            for path in paths:
+                path = Path(path)
+                full = path if path.is_absolute() else base_dir / path
+                rel = full.relative_to(base_dir).as_posix()
+                data = full.read_bytes()
+                chunks, written = self._store_file(data, previous.get(rel))
+                files.append(
+                    {
+                        "path": rel,
+                        "size": len(data),
+                        "mtime_ns": full.stat().st_mtime_ns,
+                        "sha256": hashlib.sha256(data).hexdigest(),
+                        "chunks": chunks,
+                    }
+                )
+                logical += len(data)
+                new_bytes += written
+            name = now.astimezone(timezone.utc).strftime(SNAPSHOT_FORMAT)
+            while name in names:
+                now += timedelta(microseconds=1)
+                name = now.astimezone(timezone.utc).strftime(SNAPSHOT_FORMAT)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "name": name,
+                "created": now.astimezone(timezone.utc).isoformat().replace("+00:00", "Z"),
+                "logical_bytes": logical,
+                "new_bytes": new_bytes,
+                "files": files,
+            }
+            self.snapshots_dir.mkdir(parents=True, exist_ok=True)
+            _atomic_write(self.snapshots_dir / f"{name}.json", json.dumps(manifest, indent=1).encode("utf-8"))
+        return manifest
+
+    def restore(self, name: str, dest: Path | str) -> list[Path]:
+        """Rebuild every file of snapshot `name` under `dest`, verifying sha256."""
+        dest = Path(dest)
+        restored = []
+        for entry in self.read_snapshot(name)["files"]:
+            rel = PurePosixPath(entry["path"])
+            if rel.is_absolute() or ".." in rel.parts:
+                raise StoreError(f"refusing to restore outside {dest}: {entry['path']}")
+            target = dest.joinpath(*rel.parts)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            digest = hashlib.sha256()
+            fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=".restore.")
+            try:
+                with os.fdopen(fd, "wb") as fh:
+                    for chunk_id, _size in entry["chunks"]:
+                        data = self.get_chunk(chunk_id)
+                        digest.update(data)
+                        fh.write(data)
+                if digest.hexdigest() != entry["sha256"]:
+                    raise StoreError(f"{entry['path']}: restored content does not match sha256")
+                os.replace(tmp, target)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+            os.utime(target, ns=(entry["mtime_ns"], entry["mtime_ns"]))
+            restored.append(target)
+        return restored
+
+    # --- retention and gc ------------------------------------------------
+
+    def prune(self, keep_last: int, keep_daily: int, keep_weekly: int) -> list[str]:
+        """Delete manifests outside the retention policy. Chunks are left for gc()."""
+        with self.lock():
+            names = self.snapshots()
+            keep = select_retained(names, keep_last, keep_daily, keep_weekly)
+            removed = [n for n in names if n not in keep]
+            for name in removed:
+                (self.snapshots_dir / f"{name}.json").unlink(missing_ok=True)
+        return removed
+
+    def gc(self) -> tuple[int, int]:
+        """Sweep chunks no manifest references. Returns (chunks removed, bytes freed)."""
+        removed = freed = 0
+        with self.lock():
+            live = set()
+            for name in self.snapshots():
+                for entry in self.read_snapshot(name).get("files", []):
+                    live.update(chunk_id for chunk_id, _size in entry["chunks"])
+            if not self.chunks_dir.is_dir():
+                return 0, 0
+            for path in self.chunks_dir.glob("*/*"):
+                if path.name in live:
+                    continue
+                freed += path.stat().st_size
+                path.unlink()
+                removed += 1
+        return removed, freed
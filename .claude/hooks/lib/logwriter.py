@@ -0,0 +1,319 @@
+"""
+Shared NDJSON log writer for Meridian hooks.
+
+The active segment stays at the path the hook already logs to, so anything
+tailing that file keeps working. When it grows past the size or age limit it
+is moved into `<stem>.segments/` next to it, compressed (zstd when the
+`zstandard` package is importable, gzip otherwise) and recorded in
+`<stem>.segments/index.json` with its time range and the sessions, tasks and
+tools it contains. meridian-logs.py uses that index to skip segments.
+
+Usage from a single-shot hook:
+
+    with LogWriter("tool-use", log_dir / "post_tool_use.jsonl") as log:
+        log.append(payload)
+"""
+
+from __future__ import annotations
+
+import base64
+import fcntl
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+try:
+    import zstandard
+except ImportError:  # gzip fallback keeps the hook dependency-free
+    zstandard = None
+
+TS_FORMAT = "%Y-%m-%dT%H:%M:%S.%fZ"
+TASK_RE = re.compile(r"TASK-\d{3,}")
+FSYNC_POLICIES = ("always", "batch", "rotate")
+INDEX_NAME = "index.json"
+
+DEFAULTS = {
+    "max_field_bytes": 4096,
+    "segment_max_mb": 64,
+    "segment_max_age_hours": 24,
+    "keep_days": 30,
+    "fsync": "batch",
+    "batch_size": 64,
+}
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).strftime(TS_FORMAT)
+
+
+def segments_dir(active_path: Path) -> Path:
+    return active_path.parent / f"{active_path.stem}.segments"
+
+
+def _digest(data: bytes, excerpt_bytes: int) -> dict:
+    head = data[:excerpt_bytes]
+    try:
+        excerpt: str = head.decode("utf-8")
+    except UnicodeDecodeError:
+        excerpt = "base64:" + base64.b64encode(head).decode("ascii")
+    return {
+        "truncated": True,
+        "excerpt": excerpt,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "bytes": len(data),
+    }
+
+
+def shrink(value: Any, max_field_bytes: int) -> Any:
+    """Replace oversized strings/bytes (recursively) by an excerpt, sha256 and length."""
+    if max_field_bytes <= 0:
+        return value
+    if isinstance(value, bytes):
+        return _digest(value, max_field_bytes // 4) if len(value) > max_field_bytes else _digest(value, len(value))
+    if isinstance(value, str):
+        encoded = value.encode("utf-8", "surrogatepass")
+        if len(encoded) > max_field_bytes:
+            return _digest(encoded, max_field_bytes // 4)
+        return value
+    if isinstance(value, dict):
+        return {k: shrink(v, max_field_bytes) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [shrink(v, max_field_bytes) for v in value]
+    return value
+
+
+def prepare(entry: dict, max_field_bytes: int) -> dict:
+    """Add `ts` and truncate large fields. Read results are never stored in full."""
+    entry = dict(entry)
+    entry.setdefault("ts", utc_now())
+    if entry.get("tool_name") == "Read" and "tool_response" in entry:
+        raw = json.dumps(entry["tool_response"], default=str).encode("utf-8", "surrogatepass")
+        entry["tool_response"] = _digest(raw, min(len(raw), max(max_field_bytes // 4, 256)))
+    return shrink(entry, max_field_bytes)
+
+
+def index_keys(entry: dict) -> tuple[str | None, set[str], str | None]:
+    """(session_id, task ids, tool_name) for the sidecar index."""
+    tasks = set(TASK_RE.findall(json.dumps(entry.get("tool_input", ""), default=str)))
+    for key in ("task", "task_id"):
+        if isinstance(entry.get(key), str):
+            tasks.update(TASK_RE.findall(entry[key]))
+    return entry.get("session_id"), tasks, entry.get("tool_name")
+
+
+def summarize_lines(lines: Iterator[bytes]) -> dict:
+    """Index record for a segment's lines."""
+    summary = {"count": 0, "min_ts": None, "max_ts": None, "sessions": set(), "tasks": set(), "tools": set()}
+    for line in lines:
+        try:
+            entry = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        if not isinstance(entry, dict):
+            continue
+        summary["count"] += 1
+        ts = entry.get("ts")
+        if isinstance(ts, str):
+            summary["min_ts"] = ts if summary["min_ts"] is None else min(summary["min_ts"], ts)
+            summary["max_ts"] = ts if summary["max_ts"] is None else max(summary["max_ts"], ts)
+        session, tasks, tool = index_keys(entry)
+        if session:
+            summary["sessions"].add(session)
+        summary["tasks"].update(tasks)
+        if tool:
+            summary["tools"].add(tool)
+    for key in ("sessions", "tasks", "tools"):
+        summary[key] = sorted(summary[key])
+    return summary
+
+
+def load_index(seg_dir: Path) -> list[dict]:
+    try:
+        with (seg_dir / INDEX_NAME).open(encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return []
+    return data.get("segments", []) if isinstance(data, dict) else []
+
+
+def _save_index(seg_dir: Path, segments: list[dict]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=seg_dir, prefix=".index.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"version": 1, "segments": segments}, fh, indent=1)
+        os.replace(tmp, seg_dir / INDEX_NAME)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def open_segment(path: Path):
+    """Binary line reader for a plain, gzip or zstd segment."""
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{path.name} is zstd-compressed; install the 'zstandard' package to read it")
+        import io
+
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb"), closefd=True))
+    return path.open("rb")
+
+
+def _compress(src: Path) -> Path:
+    if zstandard is not None:
+        dst = src.with_name(src.name + ".zst")
+        with src.open("rb") as fin, dst.open("wb") as fout:
+            zstandard.ZstdCompressor(level=3).copy_stream(fin, fout)
+    else:
+        dst = src.with_name(src.name + ".gz")
+        with src.open("rb") as fin, gzip.open(dst, "wb", compresslevel=6) as fout:
+            shutil.copyfileobj(fin, fout)
+    src.unlink()
+    return dst
+
+
+class LogWriter:
+    """Buffered, locked, rotating NDJSON appender for one log stream."""
+
+    def __init__(self, stream: str, active_path: Path | str, **options: Any) -> None:
+        opts = {**DEFAULTS, **{k: v for k, v in options.items() if v is not None}}
+        if opts["fsync"] not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}, got {opts['fsync']!r}")
+        self.stream = stream
+        self.active_path = Path(active_path)
+        self.seg_dir = segments_dir(self.active_path)
+        self.lock_path = self.active_path.with_name(self.active_path.name + ".lock")
+        self.max_field_bytes = int(opts["max_field_bytes"])
+        self.segment_max_bytes = int(float(opts["segment_max_mb"]) * 1024 * 1024)
+        self.segment_max_age = timedelta(hours=float(opts["segment_max_age_hours"]))
+        self.keep_days = float(opts["keep_days"])
+        self.fsync = opts["fsync"]
+        self.batch_size = max(1, int(opts["batch_size"]))
+        self._buffer: list[bytes] = []
+
+    @classmethod
+    def from_config(cls, stream: str, active_path: Path | str, config: dict | None) -> "LogWriter":
+        """Build from the `logging:` section of .meridian/config.yaml (already parsed)."""
+        section = (config or {}).get("logging") or {}
+        return cls(stream, active_path, **{k: section.get(k) for k in DEFAULTS})
+
+    def __enter__(self) -> "LogWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def append(self, entry: dict) -> None:
+        line = json.dumps(prepare(entry, self.max_field_bytes), default=str, separators=(",", ":"))
+        self._buffer.append(line.encode("utf-8") + b"\n")
+        if self.fsync == "always" or len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def close(self) -> None:
+        self.flush()
+
+    def flush(self) -> None:
+        if not self._buffer:
+            return
+        data = b"".join(self._buffer)
+        self._buffer.clear()
+        self.active_path.parent.mkdir(parents=True, exist_ok=True)
+        with self.lock_path.open("a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self._migrate_legacy()
+                with self.active_path.open("ab") as fh:
+                    fh.write(data)
+                    fh.flush()
+                    if self.fsync in ("always", "batch"):
+                        os.fsync(fh.fileno())
+                if self._should_rotate():
+                    self._rotate()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # --- rotation (caller holds the lock) ---------------------------------
+
+    def _first_ts(self) -> str | None:
+        try:
+            with self.active_path.open("rb") as fh:
+                first = fh.readline()
+            return json.loads(first).get("ts")
+        except (OSError, ValueError, AttributeError):
+            return None
+
+    def _should_rotate(self) -> bool:
+        try:
+            size = self.active_path.stat().st_size
+        except FileNotFoundError:
+            return False
+        if size >= self.segment_max_bytes:
+            return True
+        first = self._first_ts()
+        if not first:
+            return False
+        try:
+            started = datetime.strptime(first, TS_FORMAT).replace(tzinfo=timezone.utc)
+        except ValueError:
+            return False
+        return datetime.now(timezone.utc) - started >= self.segment_max_age
+
+    def _next_segment_name(self, segments: list[dict]) -> str:
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        existing = {s["file"].split(".", 1)[0] for s in segments}
+        seq = 1
+        while f"{day}-{seq:04d}" in existing:
+            seq += 1
+        return f"{day}-{seq:04d}.jsonl"
+
+    def _rotate(self) -> None:
+        self.seg_dir.mkdir(parents=True, exist_ok=True)
+        segments = load_index(self.seg_dir)
+        closed = self.seg_dir / self._next_segment_name(segments)
+        os.replace(self.active_path, closed)
+        with closed.open("rb") as fh:
+            record = summarize_lines(fh)
+        if self.fsync == "rotate":
+            with closed.open("rb") as fh:
+                os.fsync(fh.fileno())
+        record["bytes"] = closed.stat().st_size
+        record["file"] = _compress(closed).name
+        record["stream"] = self.stream
+        segments.append(record)
+        _save_index(self.seg_dir, self._apply_retention(segments))
+
+    def _apply_retention(self, segments: list[dict]) -> list[dict]:
+        if self.keep_days <= 0:
+            return segments
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=self.keep_days)).strftime(TS_FORMAT)
+        kept = []
+        for seg in segments:
+            if seg.get("max_ts") and seg["max_ts"] < cutoff:
+                (self.seg_dir / seg["file"]).unlink(missing_ok=True)
+            else:
+                kept.append(seg)
+        return kept
+
+    def _migrate_legacy(self) -> None:
+        """
+        Move a pre-NDJSON log (a JSON array rewritten on every call) out of the
+        active path once, so appends never corrupt it. meridian-logs still reads it.
+        """
+        try:
+            with self.active_path.open("rb") as fh:
+                head = fh.read(64).lstrip()
+        except FileNotFoundError:
+            return
+        if not head.startswith(b"["):
+            return
+        self.seg_dir.mkdir(parents=True, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%d%H%M%S")
+        os.replace(self.active_path, self.seg_dir / f"legacy-{stamp}.json")
@@ -0,0 +1,194 @@
+"""
+Bash command lexer for security-guard token rules.
+
+`simple_commands(cmd)` returns the argv of every command the shell could run:
+each segment between `; & && | || ( ) newline backtick`, with leading
+`VAR=val` assignments and wrappers (sudo, env, nohup, time, command, exec,
+xargs) stripped, plus the bodies of `$(…)` and backticks (also inside double
+quotes), `sh|bash|zsh -c` scripts and `eval` arguments, walked recursively.
+
+Anything the lexer cannot parse raises ShellParseError; the guard denies it
+rather than falling back to regex rules.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import shlex
+
+PUNCTUATION = "();<>|&\n`"
+START_OPERATOR_CHARS = frozenset(";&|()\n`")  # redirections (< >) do not start a command
+ASSIGNMENT_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\[[^]]*\])?\+?=")
+SHELLS = frozenset({"sh", "bash", "zsh", "dash", "ksh"})
+MAX_DEPTH = 8
+
+# Wrapper -> options that consume the next token.
+WRAPPERS: dict[str, frozenset[str]] = {
+    "sudo": frozenset({"-u", "-g", "-C", "-D", "-h", "-p", "-r", "-t", "-T", "-U"}),
+    "env": frozenset({"-u", "-C", "--unset", "--chdir"}),
+    "nohup": frozenset(),
+    "time": frozenset({"-f", "-o", "--format", "--output"}),
+    "command": frozenset(),
+    "exec": frozenset({"-a"}),
+    "xargs": frozenset({"-a", "-d", "-E", "-I", "-L", "-n", "-P", "-s", "--arg-file", "--delimiter"}),
+}
+
+
+class ShellParseError(ValueError):
+    """Command cannot be tokenized (unterminated quote or substitution, too deep)."""
+
+
+def tokenize(command: str) -> list[str]:
+    lexer = shlex.shlex(command, posix=True, punctuation_chars=PUNCTUATION)
+    lexer.whitespace_split = True
+    lexer.whitespace = " \t\r"
+    # Default commenters="#" would swallow `a#b;rm -rf /` from the `#` onwards.
+    lexer.commenters = ""
+    try:
+        return list(lexer)
+    except ValueError as exc:
+        raise ShellParseError(str(exc)) from None
+
+
+def _close_backtick(s: str, i: int) -> int:
+    while i < len(s):
+        if s[i] == "\\":
+            i += 2
+            continue
+        if s[i] == "`":
+            return i
+        i += 1
+    raise ShellParseError("unterminated backtick substitution")
+
+
+def _close_paren(s: str, i: int) -> int:
+    """Index of the `)` closing the `$(` whose body starts at `i`."""
+    quote = None
+    depth = 1
+    while i < len(s):
+        c = s[i]
+        if c == "\\" and quote != "'":
+            i += 2
+            continue
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif c == "'" and quote is None:
+            quote = "'"
+        elif c == '"':
+            quote = None if quote == '"' else '"'
+        elif c == "$" and s.startswith("$(", i):
+            i = _close_paren(s, i + 2) + 1
+            continue
+        elif c == "`":
+            i = _close_backtick(s, i + 1) + 1
+            continue
+        elif quote is None and c == "(":
+            depth += 1
+        elif quote is None and c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ShellParseError("unterminated $( substitution")
+
+
+def substitutions(command: str) -> list[str]:
+    """Bodies of top-level `$(…)` and backtick substitutions outside single quotes."""
+    bodies = []
+    quote = None
+    i = 0
+    while i < len(command):
+        c = command[i]
+        if c == "\\" and quote != "'":
+            i += 2
+            continue
+        if quote == "'":
+            if c == "'":
+                quote = None
+        elif c == "'" and quote is None:
+            quote = "'"
+        elif c == '"':
+            quote = None if quote == '"' else '"'
+        elif c == "$" and command.startswith("$(", i):
+            end = _close_paren(command, i + 2)
+            bodies.append(command[i + 2 : end])
+            i = end + 1
+            continue
+        elif c == "`":
+            end = _close_backtick(command, i + 1)
+            bodies.append(command[i + 1 : end].replace("\\`", "`"))
+            i = end + 1
+            continue
+        i += 1
+    return bodies
+
+
+def _is_start_operator(token: str) -> bool:
+    return bool(token) and set(token) <= START_OPERATOR_CHARS
+
+
+def strip_prefix(argv: list[str]) -> list[str]:
+    """Drop leading VAR=val assignments and wrapper commands with their options."""
+    i = 0
+    while i < len(argv):
+        while i < len(argv) and ASSIGNMENT_RE.match(argv[i]):
+            i += 1
+        if i == len(argv):
+            return []
+        wrapper = os.path.basename(argv[i])
+        if wrapper not in WRAPPERS:
+            break
+        i += 1
+        while i < len(argv) and argv[i].startswith("-"):
+            option = argv[i]
+            i += 1
+            if option == "--":
+                break
+            if wrapper == "command" and option in ("-v", "-V"):
+                return []  # lookup only, nothing runs
+            if wrapper == "env" and option in ("-S", "--split-string") and i < len(argv):
+                argv = tokenize(argv[i]) + argv[i + 1 :]
+                i = 0
+                break
+            if option in WRAPPERS[wrapper]:
+                i += 1
+    return argv[i:]
+
+
+def _nested_scripts(argv: list[str]) -> list[str]:
+    name = os.path.basename(argv[0])
+    if name == "eval":
+        return [" ".join(argv[1:])] if len(argv) > 1 else []
+    if name not in SHELLS:
+        return []
+    for i, arg in enumerate(argv[1:], 1):
+        if arg == "--" or not arg.startswith("-"):
+            break
+        if not arg.startswith("--") and "c" in arg[1:] and i + 1 < len(argv):
+            return [argv[i + 1]]
+    return []
+
+
+def simple_commands(command: str, _depth: int = 0) -> list[list[str]]:
+    """argv of every command `command` can start, nested ones included."""
+    if _depth > MAX_DEPTH:
+        raise ShellParseError("command nesting too deep")
+    segments: list[list[str]] = [[]]
+    for token in tokenize(command):
+        if _is_start_operator(token):
+            segments.append([])
+        else:
+            segments[-1].append(token)
+    commands = []
+    for segment in segments:
+        argv = strip_prefix(segment)
+        if not argv:
+            continue
+        commands.append(argv)
+        for script in _nested_scripts(argv):
+            commands.extend(simple_commands(script, _depth + 1))
+    for body in substitutions(command):
+        commands.extend(simple_commands(body, _depth + 1))
+    return commands
@@ -0,0 +1,116 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["pyyaml"]
+# ///
+"""
+Inspect and restore Meridian pre-compact backups in the chunk store.
+
+Usage:
+  meridian-backup.py list
+  meridian-backup.py restore <snapshot|latest> [--to DIR]
+  meridian-backup.py gc [--keep-last N] [--keep-daily N] [--keep-weekly N]
+
+`gc` applies the retention policy (config.yaml `backups:` keys, overridden by
+flags) and then sweeps chunks no remaining snapshot references. The store is
+.meridian/backups under $CLAUDE_PROJECT_DIR unless --store is given.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "lib"))
+
+from chunkstore import ChunkStore, StoreError, retention_from_config  # noqa: E402
+
+
+def load_config(project_dir: Path) -> dict:
+    try:
+        import yaml
+    except ImportError:
+        return {}
+    try:
+        with (project_dir / ".meridian" / "config.yaml").open(encoding="utf-8") as fh:
+            return yaml.safe_load(fh) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
+
+
+def human(size: int) -> str:
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return str(size)
+
+
+def cmd_list(store: ChunkStore, args: argparse.Namespace) -> int:
+    names = store.snapshots()
+    if not names:
+        print("No snapshots")
+        return 0
+    print(f"{'SNAPSHOT':<24} {'FILES':>5} {'LOGICAL':>10} {'NEW ON DISK':>12}")
+    for name in names:
+        manifest = store.read_snapshot(name)
+        print(
+            f"{name:<24} {len(manifest['files']):>5} "
+            f"{human(manifest['logical_bytes']):>10} {human(manifest['new_bytes']):>12}"
+        )
+    return 0
+
+
+def cmd_restore(store: ChunkStore, args: argparse.Namespace) -> int:
+    name = args.snapshot
+    if name == "latest":
+        names = store.snapshots()
+        if not names:
+            raise StoreError("no snapshots")
+        name = names[-1]
+    dest = args.to or Path(os.environ.get("CLAUDE_PROJECT_DIR", ".")) / ".meridian" / "backups" / "restored" / name
+    for path in store.restore(name, dest):
+        print(path)
+    return 0
+
+
+def cmd_gc(store: ChunkStore, args: argparse.Namespace) -> int:
+    policy = retention_from_config(load_config(args.project_dir))
+    for key in policy:
+        if getattr(args, key) is not None:
+            policy[key] = getattr(args, key)
+    pruned = store.prune(**policy)
+    removed, freed = store.gc()
+    print(f"Pruned {len(pruned)} snapshot(s); removed {removed} chunk(s), freed {human(freed)}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    project_dir = Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))
+    parser = argparse.ArgumentParser(description="List, restore and garbage-collect Meridian backups")
+    parser.add_argument("--store", type=Path, default=project_dir / ".meridian" / "backups")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="Snapshots with logical and new-on-disk sizes")
+    restore = sub.add_parser("restore", help="Rebuild a snapshot's files")
+    restore.add_argument("snapshot", help="Snapshot name from `list`, or `latest`")
+    restore.add_argument("--to", type=Path, default=None, help="Destination directory")
+    gc = sub.add_parser("gc", help="Apply retention, then delete unreferenced chunks")
+    gc.add_argument("--keep-last", type=int, default=None)
+    gc.add_argument("--keep-daily", type=int, default=None)
+    gc.add_argument("--keep-weekly", type=int, default=None)
+    args = parser.parse_args(argv)
+    args.project_dir = project_dir
+
+    store = ChunkStore(args.store)
+    handlers = {"list": cmd_list, "restore": cmd_restore, "gc": cmd_gc}
+    try:
+        return handlers[args.command](store, args)
+    except StoreError as exc:
+        print(f"meridian-backup: {exc}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["zstandard"]
+# ///
+"""
+Query Meridian hook logs written by lib/logwriter.py.
+
+Reads rotated segments (skipping any whose sidecar index rules them out),
+legacy JSON-array logs, then the active segment, and prints matching entries
+as NDJSON, oldest first.
+
+Usage:
+  meridian-logs.py [LOG ...] [--tool Bash] [--task TASK-012] [--session ID]
+                   [--since 2h|2026-10-01] [--until ...] [--limit N]
+
+With no LOG arguments, every *.jsonl under $CLAUDE_PROJECT_DIR/logs is queried.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent / "lib"))
+
+from logwriter import TS_FORMAT, index_keys, load_index, open_segment, segments_dir  # noqa: E402
+
+RELATIVE_RE = re.compile(r"^(\d+)([smhd])$")
+UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
+
+
+def parse_time(value: str, now: datetime | None = None) -> str:
+    """Relative (30m, 2h, 7d) or ISO-8601 date/time -> normalized UTC timestamp string."""
+    now = now or datetime.now(timezone.utc)
+    match = RELATIVE_RE.match(value)
+    if match:
+        moment = now - timedelta(**{UNITS[match.group(2)]: int(match.group(1))})
+    else:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc).strftime(TS_FORMAT)
+
+
+class Filters:
+    def __init__(self, tools=(), tasks=(), sessions=(), since=None, until=None) -> None:
+        self.tools = set(tools)
+        self.tasks = set(tasks)
+        self.sessions = set(sessions)
+        self.since = since
+        self.until = until
+
+    def segment_may_match(self, seg: dict) -> bool:
+        if self.tools and not self.tools & set(seg.get("tools", [])):
+            return False
+        if self.tasks and not self.tasks & set(seg.get("tasks", [])):
+            return False
+        if self.sessions and not self.sessions & set(seg.get("sessions", [])):
+            return False
+        if self.since and seg.get("max_ts") and seg["max_ts"] < self.since:
+            return False
+        if self.until and seg.get("min_ts") and seg["min_ts"] > self.until:
+            return False
+        return True
+
+    def entry_matches(self, entry: dict) -> bool:
+        session, tasks, tool = index_keys(entry)
+        if self.tools and tool not in self.tools:
+            return False
+        if self.tasks and not self.tasks & tasks:
+            return False
+        if self.sessions and session not in self.sessions:
+            return False
+        ts = entry.get("ts")
+        if self.since and (not isinstance(ts, str) or ts < self.since):
+            return False
+        if self.until and (not isinstance(ts, str) or ts > self.until):
+            return False
+        return True
+
+
+def _lines(path: Path) -> Iterator[dict]:
+    with open_segment(path) as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            if isinstance(entry, dict):
+                yield entry
+
+
+def _legacy(path: Path) -> Iterator[dict]:
+    try:
+        with path.open(encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return
+    for entry in data if isinstance(data, list) else []:
+        if isinstance(entry, dict):
+            yield entry
+
+
+def query(active_path: Path, filters: Filters) -> Iterator[dict]:
+    seg_dir = segments_dir(active_path)
+    if seg_dir.is_dir():
+        for legacy in sorted(seg_dir.glob("legacy-*.json")):
+            yield from (e for e in _legacy(legacy) if filters.entry_matches(e))
+        segments = sorted(load_index(seg_dir), key=lambda s: (s.get("min_ts") or "", s["file"]))
+        for seg in segments:
+            if filters.segment_may_match(seg):
+                yield from (e for e in _lines(seg_dir / seg["file"]) if filters.entry_matches(e))
+    if active_path.exists():
+        yield from (e for e in _lines(active_path) if filters.entry_matches(e))
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Filter Meridian hook logs without scanning every segment")
+    parser.add_argument("logs", nargs="*", type=Path, help="Active log file(s); default: logs/*.jsonl")
+    parser.add_argument("--tool", action="append", default=[], help="Tool name (repeatable)")
+    parser.add_argument("--task", action="append", default=[], help="TASK-### id (repeatable)")
+    parser.add_argument("--session", action="append", default=[], help="Session id (repeatable)")
+    parser.add_argument("--since", help="Relative (30m, 2h, 7d) or ISO-8601")
+    parser.add_argument("--until", help="Relative (30m, 2h, 7d) or ISO-8601")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    logs = args.logs
+    if not logs:
+        logs = sorted((Path(os.environ.get("CLAUDE_PROJECT_DIR", ".")) / "logs").glob("*.jsonl"))
+    filters = Filters(
+        tools=args.tool,
+        tasks=args.task,
+        sessions=args.session,
+        since=parse_time(args.since) if args.since else None,
+        until=parse_time(args.until) if args.until else None,
+    )
+
+    printed = 0
+    try:
+        for log in logs:
+            for entry in query(log, filters):
+                sys.stdout.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                printed += 1
+                if args.limit is not None and printed >= args.limit:
+                    return 0
+    except BrokenPipeError:
+        return 0
+    except RuntimeError as exc:
+        print(f"meridian-logs: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+import importlib.util
+import random
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+import chunkstore as cs
+
+spec = importlib.util.spec_from_file_location(
+    "meridian_backup", Path(__file__).resolve().parent.parent / "meridian-backup.py"
+)
+meridian_backup = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(meridian_backup)
+
+T0 = datetime(2026, 10, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def blob(size: int, seed: int = 1) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    (tmp_path / "transcripts").mkdir()
+    (tmp_path / "transcripts" / "session.jsonl").write_bytes(blob(1_500_000))
+    (tmp_path / "TASK-001.yaml").write_bytes(b"id: TASK-001\n")
+    return tmp_path
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> cs.ChunkStore:
+    return cs.ChunkStore(tmp_path / "backups")
+
+
+FILES = ["transcripts/session.jsonl", "TASK-001.yaml"]
+
+
+def test_chunk_sizes_respect_bounds():
+    data = blob(3_000_000)
+    spans = list(cs.chunk_spans(data))
+    assert spans[0][0] == 0 and spans[-1][1] == len(data)
+    assert all(a == b for (_, a), (b, _) in zip(spans, spans[1:]))
+    assert all(cs.MIN_CHUNK <= e - s <= cs.MAX_CHUNK for s, e in spans[:-1])
+
+
+def test_early_insert_changes_only_nearby_chunks():
+    data = blob(2_000_000)
+    edited = data[:1000] + b"inserted" + data[1000:]
+    before = {data[s:e] for s, e in cs.chunk_spans(data)}
+    after = [edited[s:e] for s, e in cs.chunk_spans(edited)]
+    assert sum(c not in before for c in after) <= 2
+
+
+def test_second_snapshot_stores_only_new_chunks(project: Path, store: cs.ChunkStore):
+    first = store.write_snapshot(project, FILES, now=T0)
+    assert first["new_bytes"] > 1_000_000
+    with (project / FILES[0]).open("ab") as fh:
+        fh.write(blob(20_000, seed=2))
+    second = store.write_snapshot(project, FILES, now=T0 + timedelta(hours=1))
+    assert second["logical_bytes"] == first["logical_bytes"] + 20_000
+    assert second["new_bytes"] < cs.MAX_CHUNK * 2
+
+
+def test_appended_reuse_matches_full_chunking(project: Path, store: cs.ChunkStore):
+    store.write_snapshot(project, FILES, now=T0)
+    with (project / FILES[0]).open("ab") as fh:
+        fh.write(blob(300_000, seed=3))
+    manifest = store.write_snapshot(project, FILES, now=T0 + timedelta(hours=1))
+    data = (project / FILES[0]).read_bytes()
+    expected = [[cs.hashlib.sha256(data[s:e]).hexdigest(), e - s] for s, e in cs.chunk_spans(data)]
+    assert manifest["files"][0]["chunks"] == expected
+
+
+def test_restore_is_byte_identical(project: Path, store: cs.ChunkStore, tmp_path: Path):
+    name = store.write_snapshot(project, FILES, now=T0)["name"]
+    (project / FILES[0]).write_bytes(b"overwritten")
+    store.restore(name, tmp_path / "out")
+    assert (tmp_path / "out" / FILES[0]).read_bytes() == blob(1_500_000)
+    assert (tmp_path / "out" / FILES[1]).read_bytes() == b"id: TASK-001\n"
+
+
+def test_restore_detects_corrupt_chunk(project: Path, store: cs.ChunkStore, tmp_path: Path):
+    manifest = store.write_snapshot(project, FILES, now=T0)
+    chunk_id = manifest["files"][1]["chunks"][0][0]
+    store.chunk_path(chunk_id).write_bytes(cs.zlib.compress(b"tampered"))
+    with pytest.raises(cs.StoreError, match="sha256"):
+        store.restore(manifest["name"], tmp_path / "out")
+
+
+def test_restore_rejects_paths_outside_destination(project: Path, store: cs.ChunkStore, tmp_path: Path):
+    manifest = store.write_snapshot(project, FILES[1:], now=T0)
+    path = store.snapshots_dir / f"{manifest['name']}.json"
+    path.write_text(path.read_text().replace('"TASK-001.yaml"', '"../escape.yaml"'))
+    with pytest.raises(cs.StoreError, match="outside"):
+        store.restore(manifest["name"], tmp_path / "out")
+
+
+def test_retention_keeps_last_daily_weekly():
+    names = [(T0 - timedelta(hours=6 * i)).strftime(cs.SNAPSHOT_FORMAT) for i in range(60)]
+    keep = cs.select_retained(names, keep_last=3, keep_daily=2, keep_weekly=2)
+    newest = sorted(names, reverse=True)
+    assert set(newest[:3]) <= keep
+    assert len(keep) == 3 + 1 + 1  # yesterday's newest, previous ISO week's newest
+
+
+def test_gc_sweeps_only_unreferenced_chunks(project: Path, store: cs.ChunkStore, tmp_path: Path):
+    old = store.write_snapshot(project, FILES, now=T0)
+    (project / FILES[0]).write_bytes(blob(400_000, seed=9))
+    new = store.write_snapshot(project, FILES, now=T0 + timedelta(days=1))
+    orphan, _ = store.put_chunk(b"left behind by a crashed backup")
+
+    assert store.prune(keep_last=1, keep_daily=0, keep_weekly=0) == [old["name"]]
+    removed, freed = store.gc()
+    assert removed > 1 and freed > 0
+    assert not store.chunk_path(orphan).exists()
+    store.restore(new["name"], tmp_path / "out")
+    assert (tmp_path / "out" / FILES[0]).read_bytes() == blob(400_000, seed=9)
+
+
+def test_cli_list_restore_gc(project: Path, store: cs.ChunkStore, tmp_path: Path, capsys, monkeypatch):
+    monkeypatch.setenv("CLAUDE_PROJECT_DIR", str(project))
+    for day in range(3):
+        store.write_snapshot(project, FILES, now=T0 + timedelta(days=day))
+    base = ["--store", str(store.root)]
+
+    assert meridian_backup.main([*base, "list"]) == 0
+    out = capsys.readouterr().out.splitlines()
+    assert out[0].startswith("SNAPSHOT") and len(out) == 4
+
+    assert meridian_backup.main([*base, "restore", "latest", "--to", str(tmp_path / "out")]) == 0
+    assert (tmp_path / "out" / FILES[1]).exists()
+
+    assert meridian_backup.main([*base, "gc", "--keep-last", "1", "--keep-daily", "0", "--keep-weekly", "0"]) == 0
+    assert "Pruned 2 snapshot(s)" in capsys.readouterr().out
+    assert len(store.snapshots()) == 1
+
+    assert meridian_backup.main([*base, "restore", "nope"]) == 1
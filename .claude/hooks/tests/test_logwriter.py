@@ -0,0 +1,144 @@
+import importlib.util
+import json
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+import logwriter as lw
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+
+spec = importlib.util.spec_from_file_location("meridian_logs", HOOKS_DIR / "meridian-logs.py")
+meridian_logs = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(meridian_logs)
+
+
+def read_active(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_bytes().splitlines()]
+
+
+def event(i: int, tool: str = "Bash", session: str = "s1", **extra) -> dict:
+    return {"session_id": session, "tool_name": tool, "tool_input": {"command": f"echo {i}"}, **extra}
+
+
+def test_appends_ndjson_to_current_log_path(tmp_path: Path):
+    active = tmp_path / "logs" / "post_tool_use.jsonl"
+    with lw.LogWriter("tool-use", active) as log:
+        log.append(event(1))
+        log.append(event(2))
+    entries = read_active(active)
+    assert [e["tool_input"]["command"] for e in entries] == ["echo 1", "echo 2"]
+    assert all(e["ts"].endswith("Z") for e in entries)
+
+
+def test_buffer_is_flushed_at_batch_size(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    log = lw.LogWriter("s", active, batch_size=2)
+    log.append(event(1))
+    assert not active.exists()
+    log.append(event(2))
+    assert len(read_active(active)) == 2
+
+
+def test_large_fields_become_digests(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    big = "x" * 10_000
+    with lw.LogWriter("s", active, max_field_bytes=1024) as log:
+        log.append(event(1, tool_response={"stdout": big}))
+    stored = read_active(active)[0]["tool_response"]["stdout"]
+    assert stored["truncated"] and stored["bytes"] == 10_000
+    assert len(stored["excerpt"]) == 256
+    assert stored["sha256"] == lw.hashlib.sha256(big.encode()).hexdigest()
+
+
+def test_read_responses_are_never_stored_in_full(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    with lw.LogWriter("s", active) as log:
+        log.append(event(1, tool="Read", tool_response={"content": "short file"}))
+    stored = read_active(active)[0]["tool_response"]
+    assert stored["truncated"] and "sha256" in stored
+
+
+def test_rotation_compresses_and_indexes_segments(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    with lw.LogWriter("s", active, segment_max_mb=0.0005, batch_size=1) as log:
+        for i in range(20):
+            log.append(event(i, tool="Bash" if i % 2 else "Edit", tool_input={"file_path": "TASK-007/x"}))
+    segments = lw.load_index(lw.segments_dir(active))
+    assert segments
+    assert all(s["file"].endswith((".gz", ".zst")) for s in segments)
+    assert sum(s["count"] for s in segments) + (len(read_active(active)) if active.exists() else 0) == 20
+    assert {"Bash", "Edit"} >= set(segments[0]["tools"])
+    assert segments[0]["tasks"] == ["TASK-007"]
+
+
+def test_retention_drops_old_segments(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    with lw.LogWriter("s", active, segment_max_mb=0.0001, batch_size=1, keep_days=1) as log:
+        log.append(event(1, ts="2020-01-01T00:00:00.000000Z"))
+        log.append(event(2))
+    seg_dir = lw.segments_dir(active)
+    assert all(s["max_ts"] > "2021" for s in lw.load_index(seg_dir))
+    assert len(list(seg_dir.glob("*.jsonl.*"))) == len(lw.load_index(seg_dir))
+
+
+def test_legacy_json_array_is_moved_aside_and_still_queryable(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    active.write_text(json.dumps([event(0, ts="2026-01-01T00:00:00.000000Z")]))
+    with lw.LogWriter("s", active) as log:
+        log.append(event(1))
+    assert len(read_active(active)) == 1
+    results = list(meridian_logs.query(active, meridian_logs.Filters()))
+    assert [r["tool_input"]["command"] for r in results] == ["echo 0", "echo 1"]
+
+
+def _writer(args):
+    path, worker = args
+    with lw.LogWriter("s", path, segment_max_mb=0.002, batch_size=3) as log:
+        for i in range(50):
+            log.append(event(worker * 1000 + i))
+
+
+def test_concurrent_writers_lose_no_lines(tmp_path: Path):
+    active = tmp_path / "a.jsonl"
+    with multiprocessing.Pool(4) as pool:
+        pool.map(_writer, [(active, w) for w in range(4)])
+    seen = list(meridian_logs.query(active, meridian_logs.Filters()))
+    assert len(seen) == 200
+    assert len({e["tool_input"]["command"] for e in seen}) == 200
+
+
+def test_query_filters_and_skips_segments(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    active = tmp_path / "a.jsonl"
+    with lw.LogWriter("s", active, segment_max_mb=0.0005, batch_size=1) as log:
+        for i in range(10):
+            log.append(event(i, tool="Edit", session="old", tool_input={"file_path": "TASK-001"}))
+        for i in range(10):
+            log.append(event(i, tool="Bash", session="new", tool_input={"command": "pytest TASK-009"}))
+    opened = []
+    real_open = meridian_logs.open_segment
+    monkeypatch.setattr(meridian_logs, "open_segment", lambda p: opened.append(p.name) or real_open(p))
+
+    hits = list(meridian_logs.query(active, meridian_logs.Filters(tools=["Bash"], tasks=["TASK-009"])))
+    assert len(hits) == 10 and {h["session_id"] for h in hits} == {"new"}
+    index = {s["file"]: s for s in lw.load_index(lw.segments_dir(active))}
+    skipped = [f for f, s in index.items() if "Bash" not in s["tools"]]
+    assert skipped and not set(skipped) & set(opened)
+
+
+def test_parse_time_relative_and_iso():
+    now = lw.datetime(2026, 10, 17, 12, 0, tzinfo=lw.timezone.utc)
+    assert meridian_logs.parse_time("2h", now) == "2026-10-17T10:00:00.000000Z"
+    assert meridian_logs.parse_time("2026-10-01", now) == "2026-10-01T00:00:00.000000Z"
+
+
+def test_cli_since_and_limit(tmp_path: Path, capsys: pytest.CaptureFixture):
+    active = tmp_path / "a.jsonl"
+    with lw.LogWriter("s", active) as log:
+        log.append(event(1, ts="2020-01-01T00:00:00.000000Z"))
+        for i in range(2, 5):
+            log.append(event(i))
+    assert meridian_logs.main([str(active), "--since", "1d", "--limit", "2"]) == 0
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(l)["tool_input"]["command"] for l in lines] == ["echo 2", "echo 3"]
@@ -0,0 +1,53 @@
+from pathlib import Path
+
+import pytest
+
+import shell_lexer as sl
+
+CORPUS = Path(__file__).resolve().parent / "corpus"
+DANGER = ["rm", "-rf", "/"]
+
+
+def corpus(name: str) -> list[str]:
+    lines = (CORPUS / name).read_text(encoding="utf-8").splitlines()
+    return [line.replace("\\n", "\n") for line in lines if line and not line.startswith("#")]
+
+
+def exposes_danger(command: str) -> bool:
+    return any(argv[:3] == DANGER for argv in sl.simple_commands(command))
+
+
+def test_operators_split_without_whitespace():
+    assert sl.tokenize("ls;rm -rf /") == ["ls", ";", "rm", "-rf", "/"]
+
+
+def test_hash_is_not_a_comment():
+    assert sl.tokenize("echo a#b;rm -rf /") == ["echo", "a#b", ";", "rm", "-rf", "/"]
+
+
+def test_substitution_bodies_skip_single_quotes():
+    assert sl.substitutions("""echo "$(a)" `b` '$(c)' $(d "$(e)")""") == ["a", "b", 'd "$(e)"']
+
+
+def test_wrappers_and_assignments_are_stripped():
+    assert sl.strip_prefix(["FOO=1", "sudo", "-u", "root", "env", "-i", "X=2", "nohup", "rm", "x"]) == ["rm", "x"]
+    assert sl.strip_prefix(["command", "-v", "rm"]) == []
+
+
+def test_nesting_limit_is_a_parse_error():
+    with pytest.raises(sl.ShellParseError):
+        sl.simple_commands("echo " + "$(" * 20 + "x" + ")" * 20)
+
+
+@pytest.mark.parametrize("command", corpus("deny.txt"))
+def test_deny_corpus_exposes_command_or_fails_to_parse(command: str):
+    try:
+        commands = sl.simple_commands(command)
+    except sl.ShellParseError:
+        return
+    assert "rm -rf /" not in command or any(argv[:3] == DANGER for argv in commands)
+
+
+@pytest.mark.parametrize("command", corpus("allow.txt"))
+def test_allow_corpus_parses_without_danger(command: str):
+    assert not exposes_danger(command)
@@ -0,0 +1,324 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = []
+# ///
+"""
+BM25 index over .meridian/memory.jsonl.
+
+memory.jsonl stays the append-only source of truth; the index at
+.meridian/memory.index.json is a disposable cache. It records a fingerprint of
+the memory file prefix it covers, so a stale index (hand edit, truncation,
+rewrite) is detected without reading the whole file and rebuilt from scratch.
+
+Usage:
+  memory_index.py build
+  memory_index.py query "TASK-012 pagination" [--top 5] [--budget 2000] [--pin mem-0001]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+
+INDEX_VERSION = 1
+PREFIX_BYTES = 4096
+FIELD_WEIGHTS = {"summary": 1, "tags": 2, "links": 2}
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Keeps ids like TASK-012, mem-0005 and file names like security-guard.py whole.
+TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-_.][a-z0-9]+)*")
+
+
+def tokenize(text: str) -> list[str]:
+    return TOKEN_RE.findall(text.lower())
+
+
+def entry_terms(entry: dict) -> Counter:
+    """Weighted term frequencies for one memory entry."""
+    terms: Counter = Counter()
+    for token in tokenize(str(entry.get("summary", ""))):
+        terms[token] += FIELD_WEIGHTS["summary"]
+    for field in ("tags", "links"):
+        for value in entry.get(field) or []:
+            for token in tokenize(str(value)):
+                terms[token] += FIELD_WEIGHTS[field]
+    return terms
+
+
+def default_paths(project_dir: Path | None = None) -> tuple[Path, Path]:
+    root = project_dir or Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))
+    meridian = root / ".meridian"
+    return meridian / "memory.jsonl", meridian / "memory.index.json"
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _fingerprint(memory_path: Path, offset: int, last_line: bytes) -> dict:
+    with memory_path.open("rb") as fh:
+        prefix = fh.read(min(PREFIX_BYTES, offset))
+    return {
+        "offset": offset,
+        "mtime_ns": memory_path.stat().st_mtime_ns,
+        "last_line_sha256": _sha256(last_line),
+        "prefix_sha256": _sha256(prefix),
+    }
+
+
+def _empty_index() -> dict:
+    return {
+        "version": INDEX_VERSION,
+        "fingerprint": {"offset": 0, "mtime_ns": 0, "last_line_sha256": _sha256(b""), "prefix_sha256": _sha256(b"")},
+        "docs": {},
+        "postings": {},
+        "total_len": 0,
+    }
+
+
+def _remove_doc(index: dict, doc_id: str) -> None:
+    doc = index["docs"].pop(doc_id, None)
+    if doc is None:
+        return
+    index["total_len"] -= doc["len"]
+    for term in list(index["postings"]):
+        postings = index["postings"][term]
+        if postings.pop(doc_id, None) is not None and not postings:
+            del index["postings"][term]
+
+
+def _add_line(index: dict, line: bytes, offset: int) -> None:
+    try:
+        entry = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return
+    if not isinstance(entry, dict) or not entry.get("id"):
+        return
+    doc_id = str(entry["id"])
+    _remove_doc(index, doc_id)
+    terms = entry_terms(entry)
+    length = sum(terms.values())
+    index["docs"][doc_id] = {
+        "offset": offset,
+        "len": length,
+        "chars": len(str(entry.get("summary", ""))),
+        "pinned": bool(entry.get("pinned")),
+    }
+    index["total_len"] += length
+    for term, tf in terms.items():
+        index["postings"].setdefault(term, {})[doc_id] = tf
+
+
+def _index_from(index: dict, memory_path: Path, start: int) -> dict:
+    """Index complete lines from byte offset `start` to EOF."""
+    offset = start
+    last_line = b""
+    with memory_path.open("rb") as fh:
+        fh.seek(start)
+        for line in fh:
+            if not line.endswith(b"\n"):
+                # Partial trailing line (writer mid-append): leave it for the next update.
+                break
+            if line.strip():
+                _add_line(index, line, offset)
+                last_line = line
+            offset += len(line)
+    if last_line:
+        index["fingerprint"] = _fingerprint(memory_path, offset, last_line)
+    else:
+        index["fingerprint"] = _fingerprint(
+            memory_path, offset, _read_last_line(memory_path, offset) if offset else b""
+        )
+    return index
+
+
+def _read_last_line(memory_path: Path, offset: int) -> bytes:
+    """Last non-blank line ending at or before `offset`."""
+    with memory_path.open("rb") as fh:
+        window = 8192
+        while True:
+            start = max(0, offset - window)
+            fh.seek(start)
+            chunk = fh.read(offset - start)
+            lines = [line for line in chunk.splitlines(keepends=True) if line.strip()]
+            if len(lines) > 1 or start == 0:
+                return lines[-1] if lines else b""
+            window *= 2
+
+
+def build(memory_path: Path) -> dict:
+    index = _empty_index()
+    if not memory_path.exists():
+        return index
+    return _index_from(index, memory_path, 0)
+
+
+def _prefix_intact(index: dict, memory_path: Path) -> bool:
+    """True when the bytes the index covers are unchanged (the file may have grown)."""
+    fp = index.get("fingerprint") or {}
+    offset = fp.get("offset", -1)
+    if not memory_path.exists():
+        return offset == 0
+    if offset < 0 or memory_path.stat().st_size < offset:
+        return False
+    if offset == 0:
+        return True
+    with memory_path.open("rb") as fh:
+        fh.seek(offset - 1)
+        if fh.read(1) != b"\n":
+            return False
+        fh.seek(0)
+        if _sha256(fh.read(min(PREFIX_BYTES, offset))) != fp.get("prefix_sha256"):
+            return False
+    return _sha256(_read_last_line(memory_path, offset)) == fp.get("last_line_sha256")
+
+
+def is_fresh(index: dict | None, memory_path: Path) -> bool:
+    if not index or index.get("version") != INDEX_VERSION:
+        return False
+    fp = index["fingerprint"]
+    if not memory_path.exists():
+        return fp["offset"] == 0
+    stat = memory_path.stat()
+    if stat.st_size != fp["offset"] or stat.st_mtime_ns != fp["mtime_ns"]:
+        return False
+    return _prefix_intact(index, memory_path)
+
+
+def update(index: dict | None, memory_path: Path) -> dict:
+    """Index entries appended since the fingerprint; rebuild if the covered prefix changed."""
+    if not index or index.get("version") != INDEX_VERSION or not _prefix_intact(index, memory_path):
+        return build(memory_path)
+    if not memory_path.exists():
+        return index
+    return _index_from(index, memory_path, index["fingerprint"]["offset"])
+
+
+def load(index_path: Path) -> dict | None:
+    try:
+        with index_path.open(encoding="utf-8") as fh:
+            index = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return index if isinstance(index, dict) else None
+
+
+def save(index: dict, index_path: Path) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=index_path.parent, prefix=".memory.index.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(index, fh, separators=(",", ":"))
+        os.replace(tmp, index_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def ensure(memory_path: Path, index_path: Path) -> dict:
+    """Return a fresh index, rebuilding and saving it if needed."""
+    index = load(index_path)
+    if is_fresh(index, memory_path):
+        return index
+    index = build(memory_path)
+    save(index, index_path)
+    return index
+
+
+def query(index: dict, text: str, top_n: int | None = None) -> list[tuple[str, float]]:
+    """BM25-ranked (id, score) pairs for documents matching any query term."""
+    docs = index["docs"]
+    if not docs:
+        return []
+    avg_len = index["total_len"] / len(docs) or 1.0
+    scores: Counter = Counter()
+    for term in set(tokenize(text)):
+        postings = index["postings"].get(term)
+        if not postings:
+            continue
+        idf = math.log(1 + (len(docs) - len(postings) + 0.5) / (len(postings) + 0.5))
+        for doc_id, tf in postings.items():
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * docs[doc_id]["len"] / avg_len)
+            scores[doc_id] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], docs[item[0]]["offset"]))
+    return ranked[:top_n] if top_n else ranked
+
+
+def estimate_tokens(index: dict, doc_id: str) -> int:
+    return max(1, index["docs"][doc_id]["chars"] // 4)
+
+
+def select(
+    index: dict,
+    text: str,
+    token_budget: int,
+    top_n: int | None = None,
+    pinned: tuple[str, ...] | list[str] = (),
+) -> list[str]:
+    """
+    Ids to inject: pinned entries first (config list, then entries flagged pinned),
+    then BM25-ranked matches, greedily filled up to `token_budget`.
+    """
+    docs = index["docs"]
+    chosen: list[str] = []
+    spent = 0
+    flagged = sorted((d for d, meta in docs.items() if meta["pinned"]), key=lambda d: docs[d]["offset"])
+    for doc_id in [*pinned, *flagged]:
+        if doc_id in docs and doc_id not in chosen:
+            chosen.append(doc_id)
+            spent += estimate_tokens(index, doc_id)
+    ranked = 0
+    for doc_id, _score in query(index, text):
+        if top_n is not None and ranked >= top_n:
+            break
+        if doc_id in chosen:
+            continue
+        cost = estimate_tokens(index, doc_id)
+        if spent + cost > token_budget:
+            continue
+        chosen.append(doc_id)
+        spent += cost
+        ranked += 1
+    return chosen
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query the memory.jsonl BM25 index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("build", help="Rebuild the index from memory.jsonl")
+    q = sub.add_parser("query", help="Rank memory entries for a query")
+    q.add_argument("text")
+    q.add_argument("--top", type=int, default=None)
+    q.add_argument("--budget", type=int, default=None, help="Token budget; enables pinned-first selection")
+    q.add_argument("--pin", action="append", default=[], help="Pinned entry id (repeatable)")
+    args = parser.parse_args()
+
+    memory_path, index_path = default_paths()
+    if args.command == "build":
+        index = build(memory_path)
+        save(index, index_path)
+        print(f"Indexed {len(index['docs'])} entries -> {index_path}")
+        return 0
+
+    index = ensure(memory_path, index_path)
+    if args.budget is not None:
+        for doc_id in select(index, args.text, args.budget, args.top, args.pin):
+            print(doc_id)
+    else:
+        for doc_id, score in query(index, args.text, args.top):
+            print(f"{doc_id}\t{score:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
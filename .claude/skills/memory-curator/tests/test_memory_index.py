@@ -0,0 +1,128 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import memory_index as mi
+
+REPO_MEMORY = Path(__file__).resolve().parents[4] / ".meridian" / "memory.jsonl"
+
+
+def entry(n: int, summary: str, tags=(), links=(), **extra) -> dict:
+    return {"id": f"mem-{n:04d}", "summary": summary, "tags": list(tags), "links": list(links), **extra}
+
+
+def append(path: Path, *entries: dict) -> None:
+    with path.open("a", encoding="utf-8") as fh:
+        for e in entries:
+            fh.write(json.dumps(e) + "\n")
+
+
+@pytest.fixture
+def memory(tmp_path: Path) -> Path:
+    path = tmp_path / "memory.jsonl"
+    append(
+        path,
+        entry(1, "**Decision:** Use cursor pagination for /api/orders", ["pattern"], ["TASK-012"]),
+        entry(2, "**Decision:** UV single-file scripts for hooks", ["tooling"], [".claude/hooks/security-guard.py"]),
+        entry(3, "**Decision:** Beads for lightweight issues", ["architecture"], ["mem-0001"]),
+    )
+    return path
+
+
+def test_tokenize_keeps_ids_and_filenames_whole():
+    assert mi.tokenize("See TASK-012 and mem-0005 in security-guard.py") == [
+        "see", "task-012", "and", "mem-0005", "in", "security-guard.py",
+    ]
+
+
+def test_incremental_update_equals_rebuild(memory: Path):
+    index = mi.build(memory)
+    append(memory, entry(4, "**Decision:** Pagination tokens are opaque", ["api"], ["TASK-012"]))
+    append(memory, entry(5, "**Decision:** Hooks exit 0 on failure", ["tooling"]))
+    assert mi.update(index, memory) == mi.build(memory)
+
+
+def test_incremental_update_over_repo_memory(tmp_path: Path):
+    lines = REPO_MEMORY.read_bytes().splitlines(keepends=True)
+    path = tmp_path / "memory.jsonl"
+    path.write_bytes(b"".join(lines[:5]))
+    index = mi.build(path)
+    for line in lines[5:]:
+        with path.open("ab") as fh:
+            fh.write(line)
+        index = mi.update(index, path)
+    assert index == mi.build(path)
+    assert len(index["docs"]) == len(lines)
+
+
+def test_fresh_until_file_changes(memory: Path):
+    index = mi.build(memory)
+    assert mi.is_fresh(index, memory)
+    append(memory, entry(4, "new"))
+    assert not mi.is_fresh(index, memory)
+
+
+def test_lengthened_earlier_entry_forces_rebuild(memory: Path):
+    index = mi.build(memory)
+    text = memory.read_text(encoding="utf-8").replace("Beads for lightweight issues", "Beads for lightweight issues and more words")
+    memory.write_text(text, encoding="utf-8")
+    assert memory.stat().st_size > index["fingerprint"]["offset"]
+    assert not mi.is_fresh(index, memory)
+    updated = mi.update(index, memory)
+    assert updated == mi.build(memory)
+    assert "words" in updated["postings"]
+
+
+def test_same_size_edit_with_preserved_mtime_detected_by_hash(memory: Path):
+    index = mi.build(memory)
+    stat = memory.stat()
+    text = memory.read_text(encoding="utf-8").replace("Beads", "Brads")
+    memory.write_text(text, encoding="utf-8")
+    os.utime(memory, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert not mi.is_fresh(index, memory)
+
+
+def test_partial_trailing_line_is_not_indexed(memory: Path):
+    with memory.open("a", encoding="utf-8") as fh:
+        fh.write('{"id": "mem-0009", "summary": "half')
+    index = mi.build(memory)
+    assert "mem-0009" not in index["docs"]
+    assert not mi.is_fresh(index, memory)
+
+
+def test_ensure_saves_and_reuses(memory: Path, tmp_path: Path):
+    index_path = tmp_path / "memory.index.json"
+    first = mi.ensure(memory, index_path)
+    assert index_path.exists()
+    assert mi.ensure(memory, index_path) == first
+    index_path.write_text("{not json", encoding="utf-8")
+    assert mi.ensure(memory, index_path) == first
+
+
+def test_query_ranks_task_links_first(memory: Path):
+    index = mi.build(memory)
+    ranked = [doc_id for doc_id, _ in mi.query(index, "TASK-012 pagination")]
+    assert ranked[0] == "mem-0001"
+    assert "mem-0002" not in ranked
+
+
+def test_select_puts_pinned_first_and_respects_budget(memory: Path):
+    append(memory, entry(4, "x" * 400, pinned=True))
+    index = mi.build(memory)
+    pinned_cost = mi.estimate_tokens(index, "mem-0003") + mi.estimate_tokens(index, "mem-0004")
+    budget = pinned_cost + mi.estimate_tokens(index, "mem-0001")
+    chosen = mi.select(index, "TASK-012 pagination", token_budget=budget, pinned=["mem-0003"])
+    assert chosen == ["mem-0003", "mem-0004", "mem-0001"]
+
+
+def test_select_keeps_pinned_even_over_budget(memory: Path):
+    index = mi.build(memory)
+    assert mi.select(index, "TASK-012", token_budget=0, pinned=["mem-0002", "mem-0099"]) == ["mem-0002"]
+
+
+def test_select_top_n_limits_ranked_entries(memory: Path):
+    index = mi.build(memory)
+    assert len(mi.select(index, "decision", token_budget=10_000, top_n=1)) == 1
+    assert len(mi.select(index, "decision", token_budget=10_000)) == 3
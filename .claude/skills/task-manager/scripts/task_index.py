@@ -0,0 +1,325 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.11"
+# dependencies = ["pyyaml"]
+# ///
+"""
+JSON sidecar index over .meridian/task-backlog.yaml.
+
+task-backlog.yaml and the TASK-### briefs stay the source of truth. The index
+at .meridian/task-index.json records the backlog's (size, mtime_ns); while
+that matches, id allocation and status/active-task queries never parse YAML.
+Every writer holds an fcntl lock on .meridian/.tasks.lock.
+
+Usage:
+  task_index.py rebuild
+  task_index.py next-id
+  task_index.py active
+  task_index.py list [--status todo] [--priority P1]
+  task_index.py allocate "Title" [--priority P2] [--status draft]
+"""
+
+from __future__ import annotations
+
+import argparse
+import fcntl
+import json
+import os
+import re
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+INDEX_VERSION = 1
+TASK_ID_RE = re.compile(r"^TASK-(\d+)$")
+BLOCK_LIST_RE = re.compile(r"^tasks:[ \t]*(#.*)?$", re.MULTILINE)
+
+
+def meridian_dir(project_dir: Path | None = None) -> Path:
+    return (project_dir or Path(os.environ.get("CLAUDE_PROJECT_DIR", "."))) / ".meridian"
+
+
+def _paths(project_dir: Path | None) -> tuple[Path, Path, Path, Path]:
+    meridian = meridian_dir(project_dir)
+    return (
+        meridian / "task-backlog.yaml",
+        meridian / "tasks",
+        meridian / "task-index.json",
+        meridian / ".tasks.lock",
+    )
+
+
+@contextmanager
+def task_lock(project_dir: Path | None = None) -> Iterator[None]:
+    """Exclusive advisory lock for any backlog, task folder or index write."""
+    lock_path = _paths(project_dir)[3]
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with lock_path.open("a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def _stat(path: Path) -> dict:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return {"size": -1, "mtime_ns": 0}
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _task_number(task_id: str) -> int | None:
+    match = TASK_ID_RE.match(str(task_id))
+    return int(match.group(1)) if match else None
+
+
+def format_task_id(number: int) -> str:
+    return f"TASK-{number:03d}"
+
+
+def _active(order: list[str], tasks: dict) -> str | None:
+    """First in_progress task, else the most recently added draft."""
+    for task_id in order:
+        if tasks[task_id]["status"] == "in_progress":
+            return task_id
+    drafts = [t for t in order if tasks[t]["status"] == "draft"]
+    return drafts[-1] if drafts else None
+
+
+def _next_id(order: list[str], tasks_dir: Path) -> str:
+    numbers = [n for n in map(_task_number, order) if n is not None]
+    if tasks_dir.is_dir():
+        numbers += [n for n in (_task_number(p.name) for p in tasks_dir.iterdir() if p.is_dir()) if n is not None]
+    return format_task_id(max(numbers, default=0) + 1)
+
+
+def _read_backlog(backlog_path: Path) -> list[dict]:
+    import yaml
+
+    try:
+        with backlog_path.open(encoding="utf-8") as fh:
+            data = yaml.safe_load(fh) or {}
+    except FileNotFoundError:
+        return []
+    return [t for t in data.get("tasks") or [] if isinstance(t, dict) and t.get("id")]
+
+
+def build(project_dir: Path | None = None) -> tuple[dict, list[str]]:
+    """Parse backlog and briefs. Returns (index, mismatch messages)."""
+    import yaml
+
+    backlog_path, tasks_dir, _, _ = _paths(project_dir)
+    stat = _stat(backlog_path)
+    root = meridian_dir(project_dir).parent
+    order: list[str] = []
+    tasks: dict[str, dict] = {}
+    problems: list[str] = []
+    for entry in _read_backlog(backlog_path):
+        task_id = str(entry["id"])
+        if task_id in tasks:
+            problems.append(f"{task_id}: listed more than once in task-backlog.yaml")
+            continue
+        path = str(entry.get("path") or f".meridian/tasks/{task_id}/")
+        order.append(task_id)
+        tasks[task_id] = {
+            "title": entry.get("title", ""),
+            "status": entry.get("status", ""),
+            "priority": entry.get("priority", ""),
+            "path": path,
+        }
+        folder = root / path
+        if not folder.is_dir():
+            problems.append(f"{task_id}: backlog path {path} does not exist")
+            continue
+        brief = folder / f"{task_id}.yaml"
+        if brief.is_file():
+            try:
+                with brief.open(encoding="utf-8") as fh:
+                    brief_status = (yaml.safe_load(fh) or {}).get("status")
+            except yaml.YAMLError as exc:
+                problems.append(f"{task_id}: unreadable brief ({exc.__class__.__name__})")
+                continue
+            if brief_status and brief_status != tasks[task_id]["status"]:
+                problems.append(
+                    f"{task_id}: backlog status {tasks[task_id]['status']!r} != brief status {brief_status!r}"
+                )
+    if tasks_dir.is_dir():
+        listed = {Path(t["path"]).name for t in tasks.values()}
+        for folder in sorted(tasks_dir.iterdir()):
+            if folder.is_dir() and _task_number(folder.name) is not None and folder.name not in listed:
+                problems.append(f"{folder.name}: folder has no task-backlog.yaml entry")
+    index = {
+        "version": INDEX_VERSION,
+        "backlog_stat": stat,
+        "next_id": _next_id(order, tasks_dir),
+        "active": _active(order, tasks),
+        "order": order,
+        "tasks": tasks,
+    }
+    return index, problems
+
+
+def is_fresh(index: dict | None, project_dir: Path | None = None) -> bool:
+    if not index or index.get("version") != INDEX_VERSION:
+        return False
+    return index.get("backlog_stat") == _stat(_paths(project_dir)[0])
+
+
+def read_index(project_dir: Path | None = None) -> dict | None:
+    try:
+        with _paths(project_dir)[2].open(encoding="utf-8") as fh:
+            index = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return index if isinstance(index, dict) else None
+
+
+def save(index: dict, project_dir: Path | None = None) -> None:
+    index_path = _paths(project_dir)[2]
+    fd, tmp = tempfile.mkstemp(dir=index_path.parent, prefix=".task-index.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(index, fh, indent=1)
+        os.replace(tmp, index_path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def rebuild(project_dir: Path | None = None) -> tuple[dict, list[str]]:
+    with task_lock(project_dir):
+        index, problems = build(project_dir)
+        save(index, project_dir)
+    return index, problems
+
+
+def load(project_dir: Path | None = None) -> dict:
+    """Fresh index; rebuilt (under the lock) only when the backlog changed."""
+    index = read_index(project_dir)
+    if is_fresh(index, project_dir):
+        return index
+    with task_lock(project_dir):
+        index = read_index(project_dir)
+        if not is_fresh(index, project_dir):
+            index, _ = build(project_dir)
+            save(index, project_dir)
+    return index
+
+
+def next_task_id(project_dir: Path | None = None) -> str:
+    return load(project_dir)["next_id"]
+
+
+def active_task(project_dir: Path | None = None) -> str | None:
+    return load(project_dir)["active"]
+
+
+def tasks(project_dir: Path | None = None, **filters: str) -> list[dict]:
+    """Backlog entries in order, filtered by exact field values (status=..., priority=...)."""
+    index = load(project_dir)
+    return [
+        {"id": task_id, **index["tasks"][task_id]}
+        for task_id in index["order"]
+        if all(index["tasks"][task_id].get(k) == v for k, v in filters.items())
+    ]
+
+
+def _backlog_entry(task: dict) -> str:
+    # json.dumps output is a valid YAML double-quoted scalar.
+    return (
+        f"  - id: {task['id']}\n"
+        f"    title: {json.dumps(task['title'], ensure_ascii=False)}\n"
+        f"    priority: {task['priority']}\n"
+        f"    status: {task['status']}\n"
+        f"    path: {json.dumps(task['path'])}\n"
+    )
+
+
+def _append_backlog(backlog_path: Path, task: dict) -> None:
+    text = backlog_path.read_text(encoding="utf-8") if backlog_path.exists() else "tasks:\n"
+    if BLOCK_LIST_RE.search(text):
+        separator = "" if text.endswith("\n") else "\n"
+        if not text.rstrip().endswith("tasks:"):
+            separator += "\n"
+        with backlog_path.open("a", encoding="utf-8") as fh:
+            if fh.tell() == 0:
+                fh.write(text)
+            fh.write(separator + _backlog_entry(task))
+            fh.flush()
+            os.fsync(fh.fileno())
+        return
+    # Flow style (tasks: [...]) cannot take a text append; re-dump instead.
+    import yaml
+
+    data = yaml.safe_load(text) or {}
+    data["tasks"] = list(data.get("tasks") or []) + [dict(task)]
+    backlog_path.write_text(yaml.safe_dump(data, sort_keys=False, allow_unicode=True), encoding="utf-8")
+
+
+def allocate(title: str, priority: str = "P2", status: str = "draft", project_dir: Path | None = None) -> str:
+    """
+    Reserve the next TASK id: create its folder, append the backlog entry, then
+    update the index. Brief files are left to the caller.
+    """
+    backlog_path, tasks_dir, _, _ = _paths(project_dir)
+    with task_lock(project_dir):
+        index = read_index(project_dir)
+        if not is_fresh(index, project_dir):
+            index, _ = build(project_dir)
+        number = _task_number(index["next_id"])
+        tasks_dir.mkdir(parents=True, exist_ok=True)
+        while (tasks_dir / format_task_id(number)).exists():
+            number += 1  # folder created by hand since the index was built
+        task_id = format_task_id(number)
+        (tasks_dir / task_id).mkdir()
+        task = {"id": task_id, "title": title, "priority": priority, "status": status, "path": f".meridian/tasks/{task_id}/"}
+        _append_backlog(backlog_path, task)
+        index["order"].append(task_id)
+        index["tasks"][task_id] = {k: task[k] for k in ("title", "status", "priority", "path")}
+        index["next_id"] = format_task_id(number + 1)
+        index["active"] = _active(index["order"], index["tasks"])
+        index["backlog_stat"] = _stat(backlog_path)
+        save(index, project_dir)
+    return task_id
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Query or rebuild the task-backlog.yaml index")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Re-parse backlog and briefs; report mismatches")
+    sub.add_parser("next-id", help="Next free TASK id")
+    sub.add_parser("active", help="Active task (first in_progress, else latest draft)")
+    ls = sub.add_parser("list", help="Backlog entries")
+    ls.add_argument("--status")
+    ls.add_argument("--priority")
+    alloc = sub.add_parser("allocate", help="Reserve the next id, create its folder and backlog entry")
+    alloc.add_argument("title")
+    alloc.add_argument("--priority", default="P2")
+    alloc.add_argument("--status", default="draft")
+    args = parser.parse_args(argv)
+
+    if args.command == "rebuild":
+        index, problems = rebuild()
+        print(f"Indexed {len(index['order'])} tasks; next id {index['next_id']}")
+        for problem in problems:
+            print(f"  mismatch: {problem}")
+        return 0
+    if args.command == "next-id":
+        print(next_task_id())
+    elif args.command == "active":
+        print(active_task() or "")
+    elif args.command == "list":
+        filters = {k: v for k, v in (("status", args.status), ("priority", args.priority)) if v}
+        for task in tasks(**filters):
+            print(f"{task['id']}\t{task['status']}\t{task['priority']}\t{task['title']}")
+    elif args.command == "allocate":
+        print(allocate(args.title, args.priority, args.status))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
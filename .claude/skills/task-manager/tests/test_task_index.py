@@ -0,0 +1,135 @@
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+import yaml
+
+import task_index as ti
+
+SCRIPT = Path(__file__).resolve().parent.parent / "scripts" / "task_index.py"
+
+BACKLOG = """\
+# Task Backlog
+# Simple index of tasks - detailed definitions live in .meridian/tasks/TASK-###/
+
+tasks:
+  - id: TASK-001
+    title: "First"
+    priority: P1
+    status: done
+    path: ".meridian/tasks/TASK-001/"
+
+  - id: example-000
+    title: "Example"
+    priority: P1
+    status: done
+    path: ".meridian/tasks/TASK-000/"
+
+  - id: TASK-007
+    title: "Seventh"
+    priority: P2
+    status: draft
+    path: ".meridian/tasks/TASK-007/"
+"""
+
+
+@pytest.fixture
+def project(tmp_path: Path) -> Path:
+    meridian = tmp_path / ".meridian"
+    (meridian / "tasks" / "TASK-001").mkdir(parents=True)
+    (meridian / "tasks" / "TASK-007").mkdir()
+    (meridian / "tasks" / "TASK-000-template").mkdir()
+    (meridian / "tasks" / "TASK-001" / "TASK-001.yaml").write_text("id: TASK-001\nstatus: done\n")
+    (meridian / "task-backlog.yaml").write_text(BACKLOG)
+    return tmp_path
+
+
+def backlog(project: Path) -> list[dict]:
+    return yaml.safe_load((project / ".meridian" / "task-backlog.yaml").read_text())["tasks"]
+
+
+def test_next_id_uses_max_numeric_task_id(project: Path):
+    assert ti.next_task_id(project) == "TASK-008"
+
+
+def test_active_is_first_in_progress_else_latest_draft(project: Path):
+    assert ti.active_task(project) == "TASK-007"
+    path = project / ".meridian" / "task-backlog.yaml"
+    path.write_text(path.read_text().replace("status: done\n    path: \".meridian/tasks/TASK-001/", "status: in_progress\n    path: \".meridian/tasks/TASK-001/"))
+    assert ti.active_task(project) == "TASK-001"
+
+
+def test_filters(project: Path):
+    assert [t["id"] for t in ti.tasks(project, status="done")] == ["TASK-001", "example-000"]
+    assert [t["id"] for t in ti.tasks(project, priority="P2")] == ["TASK-007"]
+
+
+def test_fresh_index_is_read_without_yaml(project: Path):
+    ti.rebuild(project)
+    code = (
+        f"import sys; sys.path.insert(0, {str(SCRIPT.parent)!r}); import task_index as ti; "
+        f"from pathlib import Path; p = Path({str(project)!r}); "
+        "print(ti.next_task_id(p), ti.active_task(p), 'yaml' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert out.split() == ["TASK-008", "TASK-007", "False"]
+
+
+def test_allocate_appends_in_backlog_style(project: Path):
+    assert ti.allocate('Add "quoted" title', "P1", project_dir=project) == "TASK-008"
+    text = (project / ".meridian" / "task-backlog.yaml").read_text()
+    assert text.endswith(
+        '\n\n  - id: TASK-008\n    title: "Add \\"quoted\\" title"\n    priority: P1\n'
+        '    status: draft\n    path: ".meridian/tasks/TASK-008/"\n'
+    )
+    assert text.startswith(BACKLOG)
+    assert (project / ".meridian" / "tasks" / "TASK-008").is_dir()
+    assert backlog(project)[-1]["title"] == 'Add "quoted" title'
+    assert ti.read_index(project) == ti.build(project)[0]
+
+
+def test_allocate_flow_style_backlog_falls_back_to_dump(project: Path):
+    (project / ".meridian" / "task-backlog.yaml").write_text("tasks: []\n")
+    assert ti.allocate("Only", project_dir=project) == "TASK-008"  # folders still count
+    assert [t["id"] for t in backlog(project)] == ["TASK-008"]
+
+
+def test_hand_edit_then_rebuild_matches(project: Path):
+    ti.rebuild(project)
+    path = project / ".meridian" / "task-backlog.yaml"
+    path.write_text(path.read_text() + '\n  - id: TASK-020\n    title: "Hand"\n    priority: P3\n    status: todo\n    path: ".meridian/tasks/TASK-020/"\n')
+    assert ti.next_task_id(project) == "TASK-021"  # stale stat -> rebuilt on load
+    index, problems = ti.rebuild(project)
+    assert index == ti.read_index(project)
+    assert "TASK-020: backlog path .meridian/tasks/TASK-020/ does not exist" in problems
+    assert "example-000: backlog path .meridian/tasks/TASK-000/ does not exist" in problems
+
+
+def test_rebuild_reports_orphan_folder_and_status_drift(project: Path):
+    (project / ".meridian" / "tasks" / "TASK-003").mkdir()
+    (project / ".meridian" / "tasks" / "TASK-001" / "TASK-001.yaml").write_text("id: TASK-001\nstatus: todo\n")
+    _, problems = ti.rebuild(project)
+    assert "TASK-003: folder has no task-backlog.yaml entry" in problems
+    assert "TASK-001: backlog status 'done' != brief status 'todo'" in problems
+    assert all("TASK-000-template" not in p for p in problems)
+
+
+def test_parallel_allocations_get_distinct_ids(project: Path):
+    env = {**os.environ, "CLAUDE_PROJECT_DIR": str(project)}
+
+    def run(i: int) -> str:
+        result = subprocess.run(
+            [sys.executable, str(SCRIPT), "allocate", f"Parallel {i}"],
+            env=env, capture_output=True, text=True, check=True,
+        )
+        return result.stdout.strip()
+
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        ids = list(pool.map(run, range(20)))
+    assert sorted(ids) == [f"TASK-{n:03d}" for n in range(8, 28)]
+    entries = backlog(project)
+    assert [t["id"] for t in entries[3:]] == sorted(ids)
+    assert ti.read_index(project) == ti.build(project)[0]